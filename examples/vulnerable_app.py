@@ -16,19 +16,240 @@ Vulnerabilities included:
 DO NOT deploy this anywhere - it's for local testing only!
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request
 import json
+import math
+import orjson
+import operator
 import re
 import subprocess
 import os
+import signal
+import threading
+from functools import lru_cache
 
 app = Flask(__name__)
 
+# Set VULN_APP_RE2=1 to match /api/regex with google-re2 instead of re.
+# re2 runs in linear time so the ReDoS bug (BUG 5) goes away, which is
+# handy when you're fuzzing the other endpoints and don't want one evil
+# pattern stalling the server for seconds. re2 doesn't support
+# backreferences or lookarounds, those patterns just get a 400.
+USE_RE2 = os.environ.get("VULN_APP_RE2") == "1"
+
+# Werkzeug's debugger adds a lot of per-request overhead, so it's off
+# unless you ask for it with VULN_APP_DEBUG=1
+DEBUG = os.environ.get("VULN_APP_DEBUG") == "1"
+
+# Nothing here uses templates or needs exceptions re-raised, so turn
+# that machinery off for less work per request
+app.config['DEBUG'] = DEBUG
+app.config['PROPAGATE_EXCEPTIONS'] = False
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+
+# Anything bigger than this gets a 413 before we even look at it
+app.config['MAX_CONTENT_LENGTH'] = 64 * 1024
+
+if USE_RE2:
+    import re2
+    _RE2_OPTIONS = re2.Options()
+    _RE2_OPTIONS.max_mem = 8 << 20
+    # re2 prints every pattern it can't parse to stderr by default, under
+    # fuzzing that's a write per bad pattern. We already return a 400
+    _RE2_OPTIONS.log_errors = False
+    _REGEX_ERRORS = (re.error, re2.error)
+else:
+    _REGEX_ERRORS = (re.error,)
+
+# /api/calculate operations, one dict lookup instead of an if/elif chain
+_OPS = {
+    "add": operator.add,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+    "power": operator.pow,
+}
+
+
+def ojsonify(obj, status=200):
+    """
+    Drop-in for jsonify() that serializes with orjson.
+
+    jsonify goes through the stdlib json encoder which is pure Python
+    and ends up being most of the response time under fuzzing load.
+    orjson refuses ints bigger than 64 bits (e.g. the result of a big
+    "power"), and writes NaN/Infinity as null where jsonify writes
+    NaN/Infinity. Both cases go through the stdlib encoder like before.
+    """
+    if _has_nonfinite(obj):
+        body = json.dumps(obj, separators=(",", ":"))
+    else:
+        try:
+            body = orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            body = json.dumps(obj, separators=(",", ":"))
+    return app.response_class(body, status=status, mimetype='application/json')
+
+
+def _has_nonfinite(obj):
+    """
+    True if there's a NaN or +-Infinity float anywhere in obj.
+
+    Uses a stack instead of recursion, "result" can be a deeply nested
+    list straight from the fuzzer's input.
+    """
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, float) and not math.isfinite(item):
+            return True
+    return False
+
+
+# 19+ digits in a row might be an int orjson can't hold exactly
+_LONG_NUMBER = re.compile(rb'\d{19,}')
+
+# Running share of recent bodies that weren't valid JSON, see loads()
+_invalid_share = 0.0
+
+
+def loads(body: bytes):
+    """
+    Parse a request body the same way json.loads(body) does, using orjson
+    when that gives the same answer.
+
+    The bugs are defined by what the stdlib parser does, so this has to
+    match it exactly:
+    - orjson is stricter (invalid UTF-8, no NaN/Infinity, max nesting
+      254, no BOM) and its error messages differ, so anything it rejects
+      goes to json.loads, which raises (or doesn't) like before
+    - orjson turns ints bigger than 64 bits into floats, so bodies with
+      long numbers go to json.loads too
+
+    A failed orjson.loads costs ~3us on top of the json.loads we then
+    need anyway, and under fuzzing most bodies are invalid. So while
+    more than half of the recent bodies were invalid we skip orjson
+    and just call json.loads.
+    """
+    global _invalid_share
+    if _invalid_share > 0.5:
+        try:
+            parsed = json.loads(body)
+        except ValueError:
+            # JSONDecodeError and UnicodeDecodeError
+            _invalid_share += (1.0 - _invalid_share) / 64
+            raise
+        _invalid_share -= _invalid_share / 64
+        return parsed
+
+    try:
+        parsed = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        _invalid_share += (1.0 - _invalid_share) / 64
+        return json.loads(body)
+    _invalid_share -= _invalid_share / 64
+    if _LONG_NUMBER.search(body):
+        return json.loads(body)
+    return parsed
+
+
+# Responses that never change get built once at import time instead of on
+# every request. The fuzzer hits these error paths constantly. Flask hands
+# a returned Response straight to the server without modifying it, so
+# sharing one object between requests is fine.
+NICE_TRY = ojsonify({"error": "Nice try!"}, 403)
+PING_SKIPPED = ojsonify({"stdout": "", "returncode": 1})
+COMMAND_TIMEOUT = ojsonify({"error": "Command timeout"}, 500)
+PATTERN_TOO_LONG = ojsonify({"error": "pattern too long"}, 400)
+PATTERN_REJECTED = ojsonify({"error": "pattern rejected"}, 400)
+REGEX_TIMEOUT = ojsonify({"error": "Regex timeout"}, 500)
+
+
+def file_not_found(filename):
+    """
+    404 for /api/file, only the filename part needs encoding.
+
+    orjson refuses strings with lone surrogates ("\ud800" is valid in
+    JSON input), the stdlib encoder escapes them like jsonify did.
+    """
+    message = f"File not found: {filename}"
+    try:
+        encoded = orjson.dumps(message)
+    except orjson.JSONEncodeError:
+        encoded = json.dumps(message).encode()
+    body = b'{"error":' + encoded + b'}'
+    return app.response_class(body, status=404, mimetype='application/json')
+
+
+@lru_cache(maxsize=4096)
+def _compile(pattern: str):
+    """
+    Compile a user regex, caching the result.
+
+    The fuzzer sends the same few patterns over and over, so
+    there's no point paying for re.compile every time.
+    re.error isn't cached so invalid patterns still raise.
+    """
+    if USE_RE2:
+        return re2.compile(pattern, _RE2_OPTIONS)
+    return re.compile(pattern)
+
+
+def _suspicious(pattern: str) -> bool:
+    """
+    Cheap check for patterns that are obviously built to blow up.
+
+    Lots of nested quantifiers like (a+)+ or (?:...) groups with loads
+    of +'s are what causes catastrophic backtracking. str.count runs
+    in C so this is way cheaper than compiling and matching.
+    Classic single-group ones like (a+)+b still get through, so the
+    ReDoS bug is still there to be found.
+    """
+    nested = pattern.count(')+') + pattern.count(')*')
+    return nested > 2 or ('(?:' in pattern and pattern.count('+') > 6)
+
+
+# How long findall() gets before we give up on it (seconds)
+REGEX_TIME_LIMIT = 0.05
+
+
+class RegexTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise RegexTimeout()
+
+
+def _findall(compiled, text):
+    """
+    Run compiled.findall(text), killing it after REGEX_TIME_LIMIT.
+
+    Uses SIGALRM, so this only works on POSIX and when the request is
+    handled on the main thread (e.g. gunicorn's sync workers). The
+    threaded dev server and gthread workers handle requests on other
+    threads, there it just runs without a limit. That's on purpose,
+    keeping lots of requests in flight matters more than the timer.
+    """
+    on_main_thread = threading.current_thread() is threading.main_thread()
+    if not hasattr(signal, "setitimer") or not on_main_thread:
+        return compiled.findall(text)
+
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, REGEX_TIME_LIMIT)
+    try:
+        return compiled.findall(text)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
 
 @app.route('/')
 def index():
     """Health check endpoint."""
-    return jsonify({
+    return ojsonify({
         "status": "running",
         "message": "Vulnerable test application",
         "endpoints": [
@@ -50,33 +271,49 @@ def parse_json():
     malformed input properly. The fuzzer should find inputs
     that cause exceptions.
     """
+    # Read the body outside the try so an oversized request turns
+    # into a plain 413 instead of a fake "crash"
+    data = request.get_data(cache=False)
     try:
-        data = request.get_data()
-        
-        parsed = json.loads(data)
+        parsed = loads(data)
         
         if "value" in parsed:
             result = parsed["value"] * 2
-            return jsonify({"result": result})
+            return ojsonify({"result": result})
         
-        def count_depth(obj, depth=0):
-            if depth > 100:
-                raise RecursionError("Too deep!")
-            if isinstance(obj, dict):
-                return max([count_depth(v, depth+1) for v in obj.values()] or [depth])
-            elif isinstance(obj, list):
-                return max([count_depth(v, depth+1) for v in obj] or [depth])
-            return depth
+        def count_depth(root):
+            # Iterative DFS with an explicit stack, no call frame per node
+            stack = [(root, 0)]
+            max_depth = 0
+            while stack:
+                obj, depth = stack.pop()
+                if depth > 100:
+                    raise RecursionError("Too deep!")
+                if depth > max_depth:
+                    max_depth = depth
+                if isinstance(obj, dict):
+                    for v in obj.values():
+                        stack.append((v, depth + 1))
+                elif isinstance(obj, list):
+                    for v in obj:
+                        stack.append((v, depth + 1))
+            return max_depth
         
+        # Getting a node past depth 100 needs 101 open/close bracket pairs
+        # (202 bytes), so smaller bodies can't hit the limit and we skip
+        # the walk for them.
+        if len(data) < 202:
+            return ojsonify({"parsed": True})
+
         depth = count_depth(parsed)
-        return jsonify({"parsed": True, "depth": depth})
+        return ojsonify({"parsed": True, "depth": depth})
         
     except json.JSONDecodeError as e:
 
-        return jsonify({"error": str(e), "input": data.decode(errors="replace")}), 400
+        return ojsonify({"error": str(e), "input": data.decode(errors="replace")}, 400)
     except Exception as e:
 
-        return jsonify({"error": str(e), "type": type(e).__name__}), 500
+        return ojsonify({"error": str(e)[:200], "type": type(e).__name__}, 500)
 
 
 @app.route('/api/calculate', methods=['POST'])
@@ -87,29 +324,22 @@ def calculate():
     This endpoint does math but doesn't validate input types
     or handle edge cases properly.
     """
+    body = request.get_data(cache=False)
     try:
-        data = json.loads(request.get_data())
+        data = loads(body)
         
         a = data.get("a", 0)
         b = data.get("b", 0)
         op = data.get("op", "add")
         
-
-        if op == "add":
-            result = a + b
-        elif op == "multiply":
-            result = a * b
-        elif op == "divide":
-            result = a / b
-        elif op == "power":
-            result = a ** b
-        else:
-            result = 0
+        # op might be a list/dict from the fuzzer, those aren't hashable
+        fn = _OPS.get(op) if isinstance(op, str) else None
+        result = fn(a, b) if fn else 0
         
-        return jsonify({"result": result})
+        return ojsonify({"result": result})
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)[:200]}, 500)
 
 
 @app.route('/api/ping', methods=['POST'])
@@ -120,10 +350,17 @@ def ping():
     This endpoint runs a system command with user input.
     VERY DANGEROUS - classic command injection vulnerability.
     """
+    body = request.get_data(cache=False)
     try:
-        data = json.loads(request.get_data())
+        data = loads(body)
         host = data.get("host", "localhost")
         
+        # Most fuzzed hosts are binary garbage that ping would reject anyway.
+        # Bail out early so we only pay for spawning a process when the
+        # host could plausibly be a hostname (or an injection attempt).
+        if not isinstance(host, str) or not host or len(host) > 253 or not host.isascii():
+            return PING_SKIPPED
+        
         # Bug: Command injection!
         # An attacker could send: {"host": "localhost; cat /etc/passwd"}
         # We're using shell=True which makes this exploitable
@@ -144,15 +381,15 @@ def ping():
             timeout=5
         )
         
-        return jsonify({
+        return ojsonify({
             "stdout": result.stdout[:500],
             "returncode": result.returncode
         })
         
     except subprocess.TimeoutExpired:
-        return jsonify({"error": "Command timeout"}), 500
+        return COMMAND_TIMEOUT
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)[:200]}, 500)
 
 
 @app.route('/api/file', methods=['POST'])
@@ -163,8 +400,9 @@ def read_file():
     This endpoint reads files but doesn't properly validate
     the path, allowing directory traversal attacks.
     """
+    body = request.get_data(cache=False)
     try:
-        data = json.loads(request.get_data())
+        data = loads(body)
         filename = data.get("filename", "")
         
         # Bug: Path traversal vulnerability
@@ -172,7 +410,7 @@ def read_file():
         
 
         if ".." in filename:
-            return jsonify({"error": "Nice try!"}), 403
+            return NICE_TRY
         
 
         base_dir = os.path.dirname(__file__)
@@ -181,12 +419,12 @@ def read_file():
         if os.path.exists(filepath):
             with open(filepath, 'r') as f:
                 content = f.read(1000)  # Limit size
-            return jsonify({"content": content})
+            return ojsonify({"content": content})
         else:
-            return jsonify({"error": f"File not found: {filename}"}), 404
+            return file_not_found(filename)
             
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)[:200]}, 500)
 
 
 @app.route('/api/regex', methods=['POST'])
@@ -197,8 +435,9 @@ def regex_match():
     This endpoint uses a regex that's vulnerable to
     catastrophic backtracking with certain inputs.
     """
+    body = request.get_data(cache=False)
     try:
-        data = json.loads(request.get_data())
+        data = loads(body)
         pattern = data.get("pattern", "")
         text = data.get("text", "")
         
@@ -209,18 +448,32 @@ def regex_match():
         # With input: "aaaaaaaaaaaaaaaaaaaaaaaaaaaa"
         
 
-        compiled = re.compile(pattern)
-        matches = compiled.findall(text)
+        # Long patterns would just churn the compile cache
+        if len(pattern) > 256:
+            return PATTERN_TOO_LONG
+
+        if _suspicious(pattern):
+            return PATTERN_REJECTED
+
+        compiled = _compile(pattern)
+        matches = _findall(compiled, text)
         
-        return jsonify({
+        return ojsonify({
             "matches": matches[:10],
             "count": len(matches)
         })
         
-    except re.error as e:
-        return jsonify({"error": f"Invalid regex: {e}"}), 400
+    except RegexTimeout:
+        return REGEX_TIMEOUT
+    except _REGEX_ERRORS as e:
+        return ojsonify({"error": f"Invalid regex: {e}"}, 400)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)[:200]}, 500)
+
+
+# All routes are registered now, build the URL matcher once up front
+# instead of on the first request
+app.url_map.update()
 
 
 if __name__ == '__main__':
@@ -239,7 +492,8 @@ if __name__ == '__main__':
     print("  POST /api/regex     - ReDoS vulnerability")
     print("")
     print("Starting server on http://localhost:5000")
+    print("For faster fuzzing run it under gunicorn instead, see README")
     print("=" * 50)
     
 
-    app.run(debug=True, port=5000)
+    app.run(debug=DEBUG, port=5000)
@@ -15,7 +15,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from pyfuzz.core.engine import FuzzingEngine
-from pyfuzz.targets.http_target import create_target_function
+from pyfuzz.targets.http_target import create_target_function, create_session
 
 
 def print_banner():
@@ -111,6 +111,20 @@ Examples:
         help="Directory to save crashes (default: crashes)"
     )
     
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=16,
+        help="Number of requests to keep in flight at once (default: 16)"
+    )
+    
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Send each batch of --workers requests with aiohttp (needs aiohttp installed)"
+    )
+    
     parser.add_argument(
         "--no-dictionary",
         action="store_true",
@@ -136,6 +150,8 @@ Examples:
     print(f"[*] Seeds dir:  {seeds_dir}")
     print(f"[*] Crashes dir: {crashes_dir}")
     print(f"[*] Iterations: {args.iterations}")
+    print(f"[*] Workers:    {args.workers}")
+    print(f"[*] Async:      {args.use_async}")
     print("")
     
     if args.dry_run:
@@ -147,6 +163,26 @@ Examples:
     print("")
     
 
+    if args.use_async:
+        # imported here so aiohttp is only needed when --async is used
+        from pyfuzz.targets.http_target_async import create_async_target
+        
+        target = create_async_target(args.target, args.method, concurrency=max(args.workers, 1))
+        engine = FuzzingEngine(
+            target_func=target.run,
+            seeds_dir=str(seeds_dir),
+            crashes_dir=str(crashes_dir),
+            use_dictionary=not args.no_dictionary,
+            workers=args.workers,
+            batch_func=target.run_many,
+        )
+        try:
+            engine.run(max_iterations=args.iterations)
+        finally:
+            target.close()
+        return
+    
+
     target_func = create_target_function(args.target, args.method)
     
 
@@ -155,6 +191,8 @@ Examples:
         seeds_dir=str(seeds_dir),
         crashes_dir=str(crashes_dir),
         use_dictionary=not args.no_dictionary,
+        session=create_session(pool_maxsize=max(args.workers, 1)),
+        workers=args.workers,
     )
     
     engine.run(max_iterations=args.iterations)
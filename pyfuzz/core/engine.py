@@ -12,26 +12,46 @@ I tried to model this after how AFL works, but simplified a lot.
 The real AFL has way more optimizations and features.
 """
 
+import os
 import time
+import random
+import queue
 import hashlib
+import functools
+import itertools
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
 from dataclasses import dataclass, field
-from typing import List, Dict, Callable, Optional, Set
+from typing import Any, List, Dict, Callable, Optional, Set, Tuple, Union
 from pathlib import Path
 
 from .mutators import Mutator, DictionaryMutator
 
+# Seed scheduling, a (very) simplified version of AFL's energy assignment.
+# Inputs that find new paths get extra weight so they're picked more often,
+# and every DECAY_EVERY execs all weights shrink a bit so old favourites
+# don't stay on top forever.
+NEW_PATH_BONUS = 4.0
+WEIGHT_DECAY = 0.999
+DECAY_EVERY = 1000
+
 
 @dataclass
 class FuzzResult:
     """
     Result from running a single fuzz case.
     """
-    input_data: bytes
+    # Mutators hand back bytearrays (saves a copy), so this can be either
+    input_data: Union[bytes, bytearray]
     crashed: bool = False
     error_message: str = ""
     response_data: bytes = b""
     execution_time: float = 0.0
-    coverage_hash: str = ""
+    # Targets should prefer an int here, it's cheaper to hash and store
+    # in the seen set than a string. Strings still work though.
+    coverage_hash: Union[int, str] = ""
 
 
 @dataclass
@@ -45,12 +65,14 @@ class FuzzStats:
     unique_crashes: int = 0
     unique_paths: int = 0
     start_time: float = field(default_factory=time.time)
+    # Monotonic clock for measuring elapsed time, start_time is wall clock
+    start_monotonic: float = field(default_factory=time.monotonic)
     last_new_path_time: float = 0.0
     
     @property
     def execs_per_sec(self) -> float:
         """Calculate executions per second."""
-        elapsed = time.time() - self.start_time
+        elapsed = time.monotonic() - self.start_monotonic
         if elapsed == 0:
             return 0
         return self.total_executions / elapsed
@@ -58,7 +80,7 @@ class FuzzStats:
     @property
     def runtime(self) -> float:
         """Total runtime in seconds."""
-        return time.time() - self.start_time
+        return time.monotonic() - self.start_monotonic
 
 
 class FuzzingEngine:
@@ -78,6 +100,9 @@ class FuzzingEngine:
         seeds_dir: str = "seeds",
         crashes_dir: str = "crashes",
         use_dictionary: bool = True,
+        session: Optional[Any] = None,
+        workers: int = 1,
+        batch_func: Optional[Callable[[List[bytes]], List[FuzzResult]]] = None,
     ):
         """
         Initialize the fuzzing engine.
@@ -87,7 +112,23 @@ class FuzzingEngine:
             seeds_dir: Directory with initial seed inputs
             crashes_dir: Directory to save crashes
             use_dictionary: Whether to use dictionary-based mutations
+            session: Optional connection session (e.g. requests.Session) that
+                gets passed to target_func as session=... on every call, so
+                connections stay open for the whole run
+            workers: How many target calls to keep in flight at once.
+                Only the target calls run in threads, mutation and corpus
+                updates stay on the main thread so nothing needs locking.
+                target_func has to be thread safe if this is > 1.
+            batch_func: Optional function that runs a whole list of inputs
+                and returns their results in the same order (e.g.
+                AsyncHttpTarget.run_many). If given it's used instead of
+                target_func, with `workers` inputs per batch.
         """
+        self.session = session
+        self.workers = workers
+        self.batch_func = batch_func
+        if session is not None:
+            target_func = functools.partial(target_func, session=session)
         self.target_func = target_func
         self.seeds_dir = Path(seeds_dir)
         self.crashes_dir = Path(crashes_dir)
@@ -97,20 +138,35 @@ class FuzzingEngine:
         self.crashes_dir.mkdir(parents=True, exist_ok=True)
         
 
+        self.corpus: List[bytes] = []
+        self._load_seeds()
+        
+        # The mutator gets the corpus list itself (not a copy) for
+        # splicing, so new interesting inputs are used straight away
         if use_dictionary:
-            self.mutator = DictionaryMutator()
+            self.mutator = DictionaryMutator(corpus=self.corpus)
         else:
-            self.mutator = Mutator()
+            self.mutator = Mutator(corpus=self.corpus)
         
-
-        self.corpus: List[bytes] = []
-        self._load_seeds()
+        self._rng = random.Random()
+        
+        # Pick weight for each corpus entry (same index as corpus).
+        # _cum_weights is rebuilt lazily whenever the weights change.
+        self.weights = array('f', [1.0] * len(self.corpus))
+        self._cum_weights: Optional[List[float]] = None
+        self._last_pick = 0
         
 
-        self.seen_coverage: Set[str] = set()
+        self.seen_coverage: Set[Union[int, str]] = set()
         
 
-        self.seen_crashes: Set[str] = set()
+        self.seen_crashes: Set[int] = set()
+        
+        # Crash files are written by a background thread so the fuzz
+        # loop doesn't have to wait on the disk
+        self._io_q: queue.Queue = queue.Queue()
+        self._io_thread = threading.Thread(target=self._io_loop, daemon=True)
+        self._io_thread.start()
         
 
         self.stats = FuzzStats()
@@ -126,14 +182,19 @@ class FuzzingEngine:
             self.corpus.append(b"test")
             return
         
-        for seed_file in self.seeds_dir.iterdir():
-            if seed_file.is_file():
+        # scandir gets the file type from the directory listing itself,
+        # so we don't stat every seed just to check it's a file
+        with os.scandir(self.seeds_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
                 try:
-                    data = seed_file.read_bytes()
+                    with open(entry.path, "rb") as f:
+                        data = f.read()
                     self.corpus.append(data)
-                    print(f"[*] Loaded seed: {seed_file.name} ({len(data)} bytes)")
+                    print(f"[*] Loaded seed: {entry.name} ({len(data)} bytes)")
                 except Exception as e:
-                    print(f"[!] Failed to load seed {seed_file}: {e}")
+                    print(f"[!] Failed to load seed {entry.path}: {e}")
         
         if not self.corpus:
             print("[!] No seeds found, using default")
@@ -143,57 +204,103 @@ class FuzzingEngine:
         """
         Pick an input from the corpus to mutate.
         
-        For now, just random selection. A smarter approach would
-        prioritize inputs that recently found new coverage.
+        Weighted random selection, inputs that recently found new
+        coverage are more likely to be picked (see NEW_PATH_BONUS).
         """
-        import random
-        return random.choice(self.corpus)
+        if self._cum_weights is None:
+            self._cum_weights = list(itertools.accumulate(self.weights))
+        
+        # Remember which entry we picked so it can be rewarded if
+        # its mutation finds a new path
+        self._last_pick = self._rng.choices(
+            range(len(self.corpus)), cum_weights=self._cum_weights
+        )[0]
+        return self.corpus[self._last_pick]
     
-    def _hash_crash(self, result: FuzzResult) -> str:
+    def _decay_weights(self):
+        """
+        Shrink all pick weights so new entries can catch up.
+        """
+        for i in range(len(self.weights)):
+            self.weights[i] *= WEIGHT_DECAY
+        self._cum_weights = None
+    
+    def _hash_crash(self, result: FuzzResult) -> int:
         """
         Create a hash to identify unique crashes.
         
         We use this to avoid saving duplicate crash cases.
         In a real fuzzer, you'd want to look at the stack trace too.
+        
+        This is only for dedup so it doesn't need to be a crypto hash,
+        blake2b with an 8 byte digest is faster than md5. We keep it
+        as an int since that's what goes in the seen_crashes set.
         """
-        return hashlib.md5(
-            result.error_message.encode() + result.input_data
-        ).hexdigest()[:16]
+        digest = hashlib.blake2b(
+            result.error_message.encode() + result.input_data,
+            digest_size=8,
+        ).digest()
+        return int.from_bytes(digest, "big")
     
     def _save_crash(self, result: FuzzResult):
         """
         Save a crash-inducing input to disk.
         """
-        crash_hash = self._hash_crash(result)
+        crash_key = self._hash_crash(result)
         
-        if crash_hash in self.seen_crashes:
+        if crash_key in self.seen_crashes:
             return
         
-        self.seen_crashes.add(crash_hash)
+        self.seen_crashes.add(crash_key)
         self.stats.unique_crashes += 1
         
+        crash_hash = f"{crash_key:016x}"
+        
 
         crash_file = self.crashes_dir / f"crash_{crash_hash}.bin"
-        crash_file.write_bytes(result.input_data)
+        self._io_q.put((crash_file, bytes(result.input_data)))
         
 
         info_file = self.crashes_dir / f"crash_{crash_hash}.txt"
-        info_file.write_text(
+        self._io_q.put((info_file, (
             f"Crash found at: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
             f"Error: {result.error_message}\n"
             f"Input size: {len(result.input_data)} bytes\n"
-        )
+        ).encode()))
         
         print(f"\n[!] NEW CRASH: {crash_hash}")
         print(f"    Error: {result.error_message[:100]}")
         print(f"    Saved to: {crash_file}")
     
-    def _check_new_coverage(self, result: FuzzResult) -> bool:
+    def _io_loop(self):
+        """
+        Background thread that writes queued (path, bytes) pairs to disk.
+        """
+        while True:
+            path, data = self._io_q.get()
+            try:
+                path.write_bytes(data)
+            except OSError as e:
+                print(f"\n[!] Failed to write {path}: {e}")
+            finally:
+                self._io_q.task_done()
+    
+    def flush(self):
+        """
+        Block until every queued crash file has been written.
+        """
+        self._io_q.join()
+    
+    def _check_new_coverage(self, result: FuzzResult, parent: int) -> bool:
         """
         Check if this result found new code coverage.
         
         If we found a new path, add the input to our corpus.
         This is the "coverage-guided" part of fuzzing.
+        
+        Args:
+            result: Result of running the input
+            parent: Corpus index of the seed the input was mutated from
         """
         if not result.coverage_hash:
             return False
@@ -201,20 +308,113 @@ class FuzzingEngine:
         if result.coverage_hash not in self.seen_coverage:
             self.seen_coverage.add(result.coverage_hash)
             self.corpus.append(result.input_data)
+            # Reward both the new input and the seed it was mutated from
+            self.weights.append(1.0 + NEW_PATH_BONUS)
+            self.weights[parent] += NEW_PATH_BONUS
+            self._cum_weights = None
             self.stats.unique_paths += 1
             self.stats.last_new_path_time = time.time()
             return True
         
         return False
     
+    def _next_case(self) -> Tuple[bytes, int]:
+        """
+        Pick a seed and mutate it.
+        
+        One mutate() call per case. mutate_batch only pays off at a few
+        hundred rows per call, at small batch sizes it's slower than
+        this, so the engine doesn't use it.
+        
+        Returns:
+            Tuple of (mutated input, corpus index of the seed)
+        """
+        seed = self._pick_input()
+        return self.mutator.mutate(seed), self._last_pick
+    
+    def _process_result(self, result: FuzzResult, parent: int):
+        """
+        Update stats, save crashes and check coverage for one result.
+        """
+        self.stats.total_executions += 1
+        if self.stats.total_executions % DECAY_EVERY == 0:
+            self._decay_weights()
+        
+
+        if result.crashed:
+            self._save_crash(result)
+        
+
+        self._check_new_coverage(result, parent)
+    
+    def _maybe_print_status(self, print_interval: float):
+        """
+        Print the status line if print_interval seconds have passed.
+        """
+        now = time.monotonic()
+        if now >= self._next_print:
+            self._print_status()
+            self._next_print = now + print_interval
+    
+    def _run_parallel(self, max_iterations: int, print_interval: float):
+        """
+        Fuzzing loop that keeps `workers` target calls running at once.
+        
+        HTTP targets spend most of their time waiting on the network,
+        so while one request is in flight we might as well send more.
+        Mutations are cheap so we just make a new one whenever a
+        request finishes.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            in_flight = {}
+            submitted = 0
+            
+            def submit():
+                nonlocal submitted
+                mutated, parent = self._next_case()
+                in_flight[pool.submit(self.target_func, mutated)] = parent
+                submitted += 1
+            
+            while submitted < max_iterations and len(in_flight) < self.workers:
+                submit()
+            
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    parent = in_flight.pop(future)
+                    self._process_result(future.result(), parent)
+                    if submitted < max_iterations:
+                        submit()
+                self._maybe_print_status(print_interval)
+    
+    def _run_batches(self, max_iterations: int, print_interval: float):
+        """
+        Fuzzing loop for batch_func targets.
+        
+        Makes `workers` mutations, hands them all to batch_func at once
+        and then processes the results. The target does the concurrency
+        (async requests), so there are no threads here.
+        """
+        batch_size = max(self.workers, 1)
+        done = 0
+        while done < max_iterations:
+            cases = [self._next_case() for _ in range(min(batch_size, max_iterations - done))]
+            results = self.batch_func([mutated for mutated, _ in cases])
+            for (_, parent), result in zip(cases, results):
+                self._process_result(result, parent)
+            done += len(cases)
+            self._maybe_print_status(print_interval)
+    
     def _print_status(self):
         """
         Print status line (like AFL's status screen, but simpler).
         """
+        runtime = self.stats.runtime
+        execs_per_sec = self.stats.total_executions / runtime if runtime else 0
         print(
-            f"\r[{self.stats.runtime:.1f}s] "
+            f"\r[{runtime:.1f}s] "
             f"execs: {self.stats.total_executions} "
-            f"({self.stats.execs_per_sec:.1f}/s) | "
+            f"({execs_per_sec:.1f}/s) | "
             f"crashes: {self.stats.unique_crashes} | "
             f"corpus: {len(self.corpus)} | "
             f"paths: {self.stats.unique_paths}",
@@ -222,13 +422,13 @@ class FuzzingEngine:
             flush=True,
         )
     
-    def run(self, max_iterations: int = 10000, print_interval: int = 100):
+    def run(self, max_iterations: int = 10000, print_interval: float = 0.5):
         """
         Main fuzzing loop.
         
         Args:
             max_iterations: Maximum number of test cases to run
-            print_interval: How often to print status
+            print_interval: Seconds between status updates
         """
         print("[*] Starting fuzzing...")
         print(f"[*] Corpus size: {len(self.corpus)}")
@@ -236,33 +436,38 @@ class FuzzingEngine:
         print(f"[*] Crashes dir: {self.crashes_dir}")
         print("")
         
+        # Keep the session (and its pooled connections) open for the
+        # whole loop and close it once we're done
+        session_ctx = self.session if self.session is not None else nullcontext()
+        
+        # Status is printed on a timer rather than every N iterations,
+        # so a fast target isn't held back by terminal writes
+        self._next_print = 0.0
+        
         try:
-            for i in range(max_iterations):
-
-                seed = self._pick_input()
-                
-
-                mutated = self.mutator.mutate(seed)
-                
+            with session_ctx:
+                if self.batch_func is not None:
+                    self._run_batches(max_iterations, print_interval)
+                elif self.workers > 1:
+                    self._run_parallel(max_iterations, print_interval)
+                else:
+                    for _ in range(max_iterations):
 
-                result = self.target_func(mutated)
-                
-                self.stats.total_executions += 1
+                        mutated, parent = self._next_case()
                 
 
-                if result.crashed:
-                    self._save_crash(result)
+                        result = self.target_func(mutated)
                 
 
-                self._check_new_coverage(result)
-                
-
-                if i % print_interval == 0:
-                    self._print_status()
+                        self._process_result(result, parent)
+                        self._maybe_print_status(print_interval)
         
         except KeyboardInterrupt:
             print("\n\n[*] Fuzzing interrupted by user")
         
+        finally:
+            self.flush()
+        
         print("\n")
         print("=" * 50)
         print("FUZZING COMPLETE")
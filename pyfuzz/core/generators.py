@@ -13,7 +13,7 @@ Status: Started but not fully integrated yet
 
 # TODO: Finish this and integrate with engine
 
-from typing import Dict, List, Union, Callable
+from typing import Dict, Sequence, Union, Callable
 import random
 
 
@@ -26,16 +26,79 @@ class Grammar:
     valid JSON objects, arrays, strings, etc.
     """
     
-    def __init__(self, rules: Dict[str, List[Union[str, Callable]]]):
+    def __init__(self, rules: Dict[str, Sequence[Union[str, list, Callable]]]):
         """
         Initialize grammar with production rules.
         
+        The rules are compiled here, so changing self.rules
+        afterwards won't affect generate().
+        
         Args:
-            rules: Dict mapping non-terminals to list of possible expansions
+            rules: Dict mapping non-terminals to a list or tuple of possible expansions
         """
         self.rules = rules
         self.start_symbol = "start"
         self.max_depth = 10  # Prevent infinite recursion
+        
+        self._compile()
+    
+    def _compile(self):
+        """
+        Turn the rules into integer tables for generate().
+        
+        Every rule name and every terminal string gets a number (a "node").
+        Rules are 0 .. len(rules)-1, terminals come after that and their
+        text is in self._terminals. Each expansion then becomes a number
+        too:
+        
+        - n >= 0: self._code[n] is a tuple of nodes to generate in order
+          (stored reversed, since generate() pushes them onto a stack)
+        - n < 0: call self._callables[~n] and output what it returns
+        
+        A plain string expansion is just a 1 node sequence, so
+        generate() only has to handle those two cases.
+        """
+        self._symbol_ids = {symbol: i for i, symbol in enumerate(self.rules)}
+        self._terminals = []
+        self._callables = []
+        self._code = []
+        terminal_ids = {}
+        
+        def node(part: str) -> int:
+            if part in self._symbol_ids:
+                return self._symbol_ids[part]
+            if part not in terminal_ids:
+                terminal_ids[part] = len(self.rules) + len(self._terminals)
+                self._terminals.append(part)
+            return terminal_ids[part]
+        
+        def compile_expansion(expansion) -> int:
+            if callable(expansion):
+                self._callables.append(expansion)
+                return ~(len(self._callables) - 1)
+            parts = expansion if isinstance(expansion, list) else [expansion]
+            self._code.append(tuple(node(part) for part in reversed(parts)))
+            return len(self._code) - 1
+        
+        # Options for each rule, indexed by rule id
+        self._options = []
+        # Expansions that finish straight away (no further rules).
+        # Close to max_depth we pick from these when we can, otherwise
+        # we just hit the limit and produce half-finished output.
+        self._terminal_options = []
+        
+        for expansions in self.rules.values():
+            refs = [(compile_expansion(e), self._is_terminal(e)) for e in expansions]
+            self._options.append(tuple(ref for ref, _ in refs))
+            self._terminal_options.append(tuple(ref for ref, terminal in refs if terminal))
+    
+    def _is_terminal(self, expansion) -> bool:
+        """Check if an expansion doesn't refer to any other rule."""
+        if callable(expansion):
+            return True
+        if isinstance(expansion, list):
+            return all(part not in self.rules for part in expansion)
+        return expansion not in self.rules
     
     def generate(self, symbol: str = None, depth: int = 0) -> str:
         """
@@ -51,50 +114,77 @@ class Grammar:
         if symbol is None:
             symbol = self.start_symbol
         
-        # Prevent infinite recursion
-        if depth > self.max_depth:
-            return ""
-        
         # If symbol is not in rules, it's a terminal
-        if symbol not in self.rules:
-            return symbol
-        
-        # Pick a random expansion
-        expansion = random.choice(self.rules[symbol])
+        if symbol not in self._symbol_ids:
+            return symbol if depth <= self.max_depth else ""
         
-        # If expansion is a callable, call it
-        if callable(expansion):
-            return expansion()
+        # Walk the compiled tables with an explicit stack instead of
+        # recursing, and collect the pieces in a list so we only join
+        # once at the end. Everything used in the loop is bound to a
+        # local first, and it's all ints and tuple indexing in there.
+        options_table = self._options
+        terminal_table = self._terminal_options
+        code = self._code
+        callables = self._callables
+        terminals = self._terminals
+        num_rules = len(options_table)
+        rand = random.random
+        max_depth = self.max_depth
+        near_limit = max_depth - 2
+        stack = [(self._symbol_ids[symbol], depth)]
+        push = stack.append
+        pop = stack.pop
+        out = []
+        emit = out.append
         
-        # If expansion is a list, generate each part
-        if isinstance(expansion, list):
-            result = ""
-            for part in expansion:
-                result += self.generate(part, depth + 1)
-            return result
+        while stack:
+            node, depth = pop()
+            
+            # Prevent infinite recursion
+            if depth > max_depth:
+                continue
+            
+            if node >= num_rules:
+                emit(terminals[node - num_rules])
+                continue
+            
+            # Near the depth limit, prefer expansions that end here
+            options = options_table[node]
+            if depth > near_limit and terminal_table[node]:
+                options = terminal_table[node]
+            
+            # Pick a random expansion (int(random() * n) is quicker
+            # than choice/randrange and the bias doesn't matter here)
+            ref = options[int(rand() * len(options))]
+            
+            if ref < 0:
+                emit(callables[~ref]())
+            else:
+                depth += 1
+                for part in code[ref]:
+                    push((part, depth))
         
-        # Otherwise, generate the expansion
-        return self.generate(expansion, depth + 1)
+        return "".join(out)
 
 
 # Example: Simple JSON grammar
 # TODO: Make this more complete
 JSON_GRAMMAR = Grammar({
-    "start": ["object", "array"],
-    "object": [["{", "members", "}"], ["{}"]],
-    "array": [["[", "elements", "]"], ["[]"]],
-    "members": [
+    "start": ("object", "array"),
+    "object": (["{", "members", "}"], ["{}"]),
+    "array": (["[", "elements", "]"], ["[]"]),
+    "members": (
         ["pair"],
         ["pair", ",", "members"],
-    ],
-    "pair": [["string", ":", "value"]],
-    "elements": [
+    ),
+    "pair": (["string", ":", "value"],),
+    "elements": (
         ["value"],
         ["value", ",", "elements"],
-    ],
-    "value": ["string", "number", "object", "array", "true", "false", "null"],
-    "string": [lambda: f'"{random_string()}"'],
-    "number": [lambda: str(random.randint(-1000, 1000))],
+    ),
+    "value": ("string", "number", "object", "array", "true", "false", "null"),
+    "string": (lambda: f'"{random_string()}"',),
+    "number": (lambda: str(random.randint(-1000, 1000)),),
 })
 
 
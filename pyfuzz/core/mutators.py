@@ -9,15 +9,73 @@ I learned about these strategies from reading about AFL:
 https://lcamtuf.coredump.cx/afl/technical_details.txt
 """
 
+import os
 import random
 import struct
-from typing import List
+from typing import List, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, mutate_batch falls back to a loop
+    np = None
 
 # Boundary values known to trigger integer-related bugs
 INTERESTING_8 = [0, 1, 127, 128, 255]
 INTERESTING_16 = [0, 1, 32767, 32768, 65535]
 INTERESTING_32 = [0, 1, 2147483647, 2147483648, 4294967295]
 
+# Same values already packed little-endian, so _insert_interesting
+# doesn't call struct.pack every time. 8-bit values stay ints since
+# data[pos] = int is cheaper than a 1-byte slice assignment
+INTERESTING_8_VALUES = tuple(INTERESTING_8)
+INTERESTING_16_PACKED = tuple(struct.pack('<H', v) for v in INTERESTING_16)
+INTERESTING_32_PACKED = tuple(struct.pack('<I', v) for v in INTERESTING_32)
+
+# How many random bytes we grab at once for _draw()
+RAND_POOL_SIZE = 65536
+
+# Our own Random instance for the mutation code, with its C methods
+# bound once. random.randint/randrange go through a few layers of
+# Python code for every call, getrandbits() is a single C call.
+# `x % n` on random bits is very slightly biased, fine for fuzzing.
+# Mutator(seed=...) seeds this so runs are still reproducible
+_rng = random.Random()
+_bits = _rng.getrandbits
+_choice = _rng.choice
+
+# The numba kernel for mutate_batch. Importing numba takes a few hundred
+# ms, so it's only loaded the first time mutate_batch runs (see
+# _point_mutations), not by everything that imports this module
+_kernel = None
+_kernel_loaded = False
+
+
+def _point_mutations():
+    """
+    Get mutators_kernels.point_mutations, importing it on first use.
+    
+    Returns:
+        The compiled kernel, or None if numba isn't installed
+    """
+    global _kernel, _kernel_loaded
+    if not _kernel_loaded:
+        try:
+            from .mutators_kernels import point_mutations
+        except ImportError:  # running this file directly (python mutators.py)
+            from mutators_kernels import point_mutations
+        _kernel = point_mutations
+        _kernel_loaded = True
+    return _kernel
+
+
+if np is not None:
+    # Same tables as little-endian byte rows, for mutate_batch
+    _INTERESTING_ROWS = (
+        np.array(INTERESTING_8, dtype=np.uint8).reshape(-1, 1),
+        np.array(INTERESTING_16, dtype='<u2').view(np.uint8).reshape(-1, 2),
+        np.array(INTERESTING_32, dtype='<u4').view(np.uint8).reshape(-1, 4),
+    )
+
 
 class Mutator:
     """
@@ -27,65 +85,202 @@ class Mutator:
     The goal is to explore different inputs that might crash the target.
     """
     
-    def __init__(self, seed: int = None):
+    def __init__(self, seed: int = None, corpus: Optional[List[bytes]] = None):
         """
         Initialize mutator with optional random seed for reproducibility.
         
         Args:
             seed: Random seed for reproducible mutations
+            corpus: Optional list of inputs to splice with (see _splice).
+                We keep a reference, not a copy, so inputs the engine
+                adds later get used too.
         """
+        self.corpus = corpus if corpus is not None else []
         if seed is not None:
-            random.seed(seed)
+            _rng.seed(seed)
+        
+        # Random bytes for the hot mutations come from one big block
+        # instead of a randint() call per field. With a seed we fill the
+        # block from a seeded Random so runs are still reproducible,
+        # otherwise straight from os.urandom
+        self._pool_rng = random.Random(seed) if seed is not None else None
+        self._rand_pool = b""
+        self._rand_off = 0
+        
+        self._np_rng = np.random.default_rng(seed) if np is not None else None
+        
+        # Strategy methods for mutate(), built once here instead of a new
+        # list of bound methods on every call. _splice only goes in once
+        # the corpus has something to splice with
+        self._strategies = (
+            self._bit_flip,
+            self._byte_flip,
+            self._insert_interesting,
+            self._delete_bytes,
+            self._insert_bytes,
+            self._swap_bytes,
+        )
+        self._strategies_splice = self._strategies + (self._splice,)
     
-    def mutate(self, data: bytes) -> bytes:
+    def mutate(self, data: bytes) -> Union[bytes, bytearray]:
         """
         Apply a random mutation to the input data.
         
+        The strategy methods below all change the bytearray they get in
+        place and return it, so the only copy of the input is the
+        bytearray() made here (no bytes() copy back at the end).
+        
         Args:
             data: Original input bytes
             
         Returns:
-            Mutated version of the input
+            Mutated version of the input (a bytearray)
         """
         if len(data) == 0:
             return data
         
 
-        strategies = [
-            self._bit_flip,
-            self._byte_flip,
-            self._insert_interesting,
-            self._delete_bytes,
-            self._insert_bytes,
-            self._swap_bytes,
-        ]
+        if len(self.corpus) >= 2:
+            strategies = self._strategies_splice
+        else:
+            strategies = self._strategies
+        
+        # random byte mod 6 (or 7), the first few strategies get picked
+        # very slightly more, doesnt matter here
+        strategy = strategies[_bits(8) % len(strategies)]
+        return strategy(bytearray(data))
+    
+    def _draw(self, n: int) -> memoryview:
+        """
+        Get n random bytes from the pool, refilling it when it runs out.
         
-        strategy = random.choice(strategies)
-        return strategy(data)
+        Args:
+            n: How many bytes we need
+            
+        Returns:
+            A memoryview slice of the pool (dont hold on to it)
+        """
+        off = self._rand_off
+        if off + n > len(self._rand_pool):
+            size = max(RAND_POOL_SIZE, n)
+            if self._pool_rng is not None:
+                self._rand_pool = memoryview(self._pool_rng.randbytes(size))
+            else:
+                self._rand_pool = memoryview(os.urandom(size))
+            off = 0
+        self._rand_off = off + n
+        return self._rand_pool[off:off + n]
+    
+    def mutate_batch(self, data: bytes, n: int) -> List[Union[bytes, bytearray]]:
+        """
+        Make n mutations of the same input in one go.
+        
+        The strategies that keep the length the same (bit flip, byte flip,
+        interesting values, swap) are applied to the whole batch at once
+        with numpy, as an (n, len(data)) array. If numba is installed the
+        bit flip, byte flip and swap rows go through the compiled
+        point_mutations kernel instead. Insert/delete change the length
+        so those rows still go through the normal methods.
+        Without numpy this is just a loop over mutate().
+        
+        Args:
+            data: Original input bytes
+            n: How many mutations to make
+            
+        Returns:
+            List of n mutated inputs
+        """
+        if np is None or len(data) == 0:
+            # Mutator.mutate, not self.mutate, so subclasses that add
+            # their own chance in mutate_batch (DictionaryMutator) don't
+            # get it applied twice
+            return [Mutator.mutate(self, data) for _ in range(n)]
+        
+        rng = self._np_rng
+        size = len(data)
+        
+        # Same numbering as the strategies list in mutate()
+        num_strategies = 7 if len(self.corpus) >= 2 else 6
+        strategy = rng.integers(0, num_strategies, n)
+        buf = np.tile(np.frombuffer(data, dtype=np.uint8), (n, 1))
+        
+        kernel = _point_mutations()
+        if kernel is not None:
+            # bit flip, byte flip and swap in one compiled pass
+            kernel(
+                buf,
+                strategy,
+                rng.integers(0, size, n),
+                rng.integers(0, size, n),
+                rng.integers(0, 256, n, dtype=np.uint8),
+            )
+        else:
+            # bit flip
+            rows = np.flatnonzero(strategy == 0)
+            pos = rng.integers(0, size, len(rows))
+            bits = rng.integers(0, 8, len(rows))
+            buf[rows, pos] ^= (1 << bits).astype(np.uint8)
+            
+            # byte flip
+            rows = np.flatnonzero(strategy == 1)
+            pos = rng.integers(0, size, len(rows))
+            buf[rows, pos] = rng.integers(0, 256, len(rows), dtype=np.uint8)
+            
+            # swap
+            rows = np.flatnonzero(strategy == 5)
+            if size >= 2:
+                a = rng.integers(0, size, len(rows))
+                b = rng.integers(0, size, len(rows))
+                tmp = buf[rows, a].copy()
+                buf[rows, a] = buf[rows, b]
+                buf[rows, b] = tmp
+        
+        # interesting values, skipped if the value doesn't fit at pos
+        # (same as _insert_interesting)
+        rows = np.flatnonzero(strategy == 2)
+        pos = rng.integers(0, size, len(rows))
+        width_idx = rng.integers(0, 3, len(rows))
+        for i, table in enumerate(_INTERESTING_ROWS):
+            width = table.shape[1]
+            fits = (width_idx == i) & (pos + width <= size)
+            r, p = rows[fits], pos[fits]
+            values = table[rng.integers(0, len(table), len(r))]
+            buf[r[:, None], p[:, None] + np.arange(width)] = values
+        
+        results = [row.tobytes() for row in buf]
+        
+        for i in np.flatnonzero(strategy == 3):
+            results[i] = self._delete_bytes(bytearray(data))
+        for i in np.flatnonzero(strategy == 4):
+            results[i] = self._insert_bytes(bytearray(data))
+        for i in np.flatnonzero(strategy == 6):
+            results[i] = self._splice(bytearray(data))
+        
+        return results
     
-    def _bit_flip(self, data: bytes) -> bytes:
+    def _bit_flip(self, data: bytearray) -> bytearray:
         """
         Flip a random bit in the data.
         
         This is one of the simplest mutations - just flip one bit.
         Sometimes this is enough to trigger different code paths.
         """
-        data = bytearray(data)
-        pos = random.randint(0, len(data) - 1)
-        bit = random.randint(0, 7)
-        data[pos] ^= (1 << bit)
-        return bytes(data)
+        # 4 bytes for the position so big inputs still get covered
+        r = self._draw(5)
+        pos = int.from_bytes(r[0:4], 'little') % len(data)
+        data[pos] ^= (1 << (r[4] & 7))
+        return data
     
-    def _byte_flip(self, data: bytes) -> bytes:
+    def _byte_flip(self, data: bytearray) -> bytearray:
         """
         Replace a random byte with a random value.
         """
-        data = bytearray(data)
-        pos = random.randint(0, len(data) - 1)
-        data[pos] = random.randint(0, 255)
-        return bytes(data)
+        r = self._draw(5)
+        pos = int.from_bytes(r[0:4], 'little') % len(data)
+        data[pos] = r[4]
+        return data
     
-    def _insert_interesting(self, data: bytes) -> bytes:
+    def _insert_interesting(self, data: bytearray) -> bytearray:
         """
         Insert an "interesting" value at a random position.
         
@@ -95,26 +290,23 @@ class Mutator:
         - Off-by-one errors  
         - Buffer overflows
         """
-        data = bytearray(data)
-        pos = random.randint(0, len(data) - 1)
+        pos = _bits(32) % len(data)
         
 
-        choice = random.randint(0, 2)
+        choice = _bits(8) % 3
         
         if choice == 0 and len(data) >= 1:
-            data[pos] = random.choice(INTERESTING_8)
+            data[pos] = INTERESTING_8_VALUES[_bits(8) % len(INTERESTING_8_VALUES)]
         elif choice == 1 and len(data) >= 2:
-            val = random.choice(INTERESTING_16)
             if pos + 1 < len(data):
-                data[pos:pos+2] = struct.pack('<H', val)
+                data[pos:pos+2] = INTERESTING_16_PACKED[_bits(8) % len(INTERESTING_16_PACKED)]
         elif choice == 2 and len(data) >= 4:
-            val = random.choice(INTERESTING_32)
             if pos + 3 < len(data):
-                data[pos:pos+4] = struct.pack('<I', val)
+                data[pos:pos+4] = INTERESTING_32_PACKED[_bits(8) % len(INTERESTING_32_PACKED)]
         
-        return bytes(data)
+        return data
     
-    def _delete_bytes(self, data: bytes) -> bytes:
+    def _delete_bytes(self, data: bytearray) -> bytearray:
         """
         Delete a random chunk of bytes.
         
@@ -123,27 +315,26 @@ class Mutator:
         if len(data) <= 1:
             return data
             
-        data = bytearray(data)
-        pos = random.randint(0, len(data) - 1)
-        length = random.randint(1, min(10, len(data) - pos))
+        pos = _bits(32) % len(data)
+        length = 1 + _bits(8) % min(10, len(data) - pos)
         del data[pos:pos + length]
-        return bytes(data)
+        return data
     
-    def _insert_bytes(self, data: bytes) -> bytes:
+    def _insert_bytes(self, data: bytearray) -> bytearray:
         """
         Insert random bytes at a random position.
         
         Extra input can cause buffer overflows if the target
         doesn't properly validate input length.
         """
-        data = bytearray(data)
-        pos = random.randint(0, len(data))
-        length = random.randint(1, 10)
-        new_bytes = bytes([random.randint(0, 255) for _ in range(length)])
-        data[pos:pos] = new_bytes
-        return bytes(data)
+        r = self._draw(5)
+        pos = int.from_bytes(r[0:4], 'little') % (len(data) + 1)
+        length = 1 + r[4] % 10
+        # payload comes straight out of the pool too
+        data[pos:pos] = self._draw(length)
+        return data
     
-    def _swap_bytes(self, data: bytes) -> bytes:
+    def _swap_bytes(self, data: bytearray) -> bytearray:
         """
         Swap two random bytes.
         
@@ -152,11 +343,26 @@ class Mutator:
         if len(data) < 2:
             return data
             
-        data = bytearray(data)
-        pos1 = random.randint(0, len(data) - 1)
-        pos2 = random.randint(0, len(data) - 1)
+        pos1 = _bits(32) % len(data)
+        pos2 = _bits(32) % len(data)
         data[pos1], data[pos2] = data[pos2], data[pos1]
-        return bytes(data)
+        return data
+    
+    def _splice(self, data: bytearray) -> bytearray:
+        """
+        Join the start of this input to the end of another corpus entry.
+        
+        This is AFL's splice stage. Two inputs that each reach some
+        interesting code can combine into one that gets further.
+        """
+        other = _choice(self.corpus)
+        if len(other) == 0:
+            return data
+        
+        cut1 = _bits(32) % len(data)
+        cut2 = _bits(32) % len(other)
+        data[cut1:] = other[cut2:]
+        return data
 
 
 class DictionaryMutator(Mutator):
@@ -168,13 +374,19 @@ class DictionaryMutator(Mutator):
     likely to trigger interesting parsing behavior.
     """
     
-    def __init__(self, dictionary: List[bytes] = None, seed: int = None):
+    def __init__(
+        self,
+        dictionary: List[bytes] = None,
+        seed: int = None,
+        corpus: Optional[List[bytes]] = None,
+    ):
         """
         Args:
             dictionary: List of interesting byte sequences to insert
             seed: Random seed for reproducibility
+            corpus: Optional list of inputs to splice with
         """
-        super().__init__(seed)
+        super().__init__(seed, corpus)
         
 
         self.dictionary = dictionary or [
@@ -197,26 +409,42 @@ class DictionaryMutator(Mutator):
             b'0',
             b'99999999',
         ]
+        # tuple copy for _choice(), if you change self.dictionary later
+        # remember to update this too
+        self._dict_tuple = tuple(self.dictionary)
     
-    def mutate(self, data: bytes) -> bytes:
+    def mutate(self, data: bytes) -> Union[bytes, bytearray]:
         """
         Apply mutation, sometimes using dictionary tokens.
         """
 
-        if random.random() < 0.3:
-            return self._insert_dictionary_token(data)
+        # 307/1024 is about 30%
+        if _bits(10) < 307:
+            return self._insert_dictionary_token(bytearray(data))
         
         return super().mutate(data)
     
-    def _insert_dictionary_token(self, data: bytes) -> bytes:
+    def mutate_batch(self, data: bytes, n: int) -> List[Union[bytes, bytearray]]:
+        """
+        Batch version of mutate(), with the same 30% dictionary chance.
+        
+        The dictionary rows are counted first so the base class only
+        makes the rest, instead of making all n and throwing some away.
+        """
+        num_dict = sum(_bits(10) < 307 for _ in range(n))
+        results = super().mutate_batch(data, n - num_dict)
+        for _ in range(num_dict):
+            results.append(self._insert_dictionary_token(bytearray(data)))
+        return results
+    
+    def _insert_dictionary_token(self, data: bytearray) -> bytearray:
         """
         Insert a dictionary token at a random position.
         """
-        data = bytearray(data)
-        token = random.choice(self.dictionary)
-        pos = random.randint(0, len(data))
+        token = _choice(self._dict_tuple)
+        pos = _bits(32) % (len(data) + 1)
         data[pos:pos] = token
-        return bytes(data)
+        return data
 
 
 
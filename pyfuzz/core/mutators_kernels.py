@@ -0,0 +1,48 @@
+"""
+Compiled kernels for Mutator.mutate_batch
+
+mutate_batch already does the fixed-size mutations with numpy, but
+every strategy there is a few fancy-indexing calls that each make a
+temporary array. With numba installed (pip install numba) the bit flip,
+byte flip and swap rows are done in one compiled loop over the batch
+instead.
+
+numba is optional. Without it point_mutations is None and
+mutate_batch just keeps using the numpy version.
+"""
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, see module docstring
+    njit = None
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def point_mutations(buf, strategy, pos, pos2, vals):
+        """
+        Apply bit flip / byte flip / swap to every row that picked one.
+        
+        Args:
+            buf: (n, size) uint8 array, one row per mutation, changed in place
+            strategy: Strategy number for each row (same numbering as mutate())
+            pos: Position to mutate in each row
+            pos2: Second position in each row (only used by swap)
+            vals: Random byte for each row (bit number / new byte value)
+        """
+        for row in range(buf.shape[0]):
+            s = strategy[row]
+            p = pos[row]
+            if s == 0:
+                buf[row, p] ^= 1 << (vals[row] & 7)
+            elif s == 1:
+                buf[row, p] = vals[row]
+            elif s == 5:
+                q = pos2[row]
+                tmp = buf[row, p]
+                buf[row, p] = buf[row, q]
+                buf[row, q] = tmp
+
+else:
+    point_mutations = None
@@ -15,15 +15,36 @@ Since we're fuzzing Python code or HTTP endpoints, we focus on:
 - Memory issues
 """
 
+import os
 import time
+import atexit
+import queue
+import logging
+import threading
 import traceback
 import hashlib
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Callable, Any, Optional
+from functools import cached_property
+from typing import Callable, Any, Optional, Tuple
 from pathlib import Path
 
 import psutil
 
+from .shared_dedup import SharedBloom
+
+
+log = logging.getLogger(__name__)
+
+# For check_memory_usage(). On Linux /proc/self/statm has the RSS in
+# pages, we keep it open and pread() it instead of going through psutil.
+# _statm_pid is there because after a fork the fd still points at the
+# parent's /proc entry
+_STATM = "/proc/self/statm"
+_statm_fd: Optional[int] = None
+_statm_pid: Optional[int] = None
+_statm_ok = True
+
 
 @dataclass
 class CrashInfo:
@@ -40,20 +61,33 @@ class CrashInfo:
         if self.timestamp == 0.0:
             self.timestamp = time.time()
     
-    @property
+    @cached_property
+    def trace_key(self) -> str:
+        """
+        First 3 lines of the stack trace.
+        
+        Uses partition() instead of split() so we don't build a list
+        of every line in a long trace just to keep three.
+        """
+        line1, sep1, rest = self.stack_trace.partition('\n')
+        line2, sep2, rest = rest.partition('\n')
+        line3 = rest.partition('\n')[0]
+        return line1 + sep1 + line2 + sep2 + line3
+    
+    @cached_property
     def crash_hash(self) -> str:
         """
         Generate a hash to identify unique crashes.
         
         We hash the crash type and first 3 lines of stack trace.
         This helps deduplicate crashes that have the same root cause.
-        """
-
-        trace_lines = self.stack_trace.split('\n')[:3]
-        trace_key = '\n'.join(trace_lines)
         
-        hash_input = f"{self.crash_type}:{trace_key}"
-        return hashlib.md5(hash_input.encode()).hexdigest()[:12]
+        It's only used for dedup so blake2b with a 6 byte digest
+        (12 hex chars) is plenty, and faster than md5. The result is
+        cached since it gets checked more than once per crash.
+        """
+        hash_input = f"{self.crash_type}:{self.trace_key}"
+        return hashlib.blake2b(hash_input.encode(), digest_size=6).hexdigest()
 
 
 class CrashMonitor:
@@ -68,7 +102,11 @@ class CrashMonitor:
         self,
         timeout: float = 5.0,
         max_memory_mb: int = 500,
-        crashes_dir: str = "crashes"
+        crashes_dir: str = "crashes",
+        bloom: Optional[SharedBloom] = None,
+        max_seen: int = 100_000,
+        seen_ttl: float = 600.0,
+        crash_file_ttl: Optional[float] = None,
     ):
         """
         Initialize crash monitor.
@@ -77,6 +115,16 @@ class CrashMonitor:
             timeout: Maximum execution time before considering it a hang
             max_memory_mb: Maximum memory usage before considering it a bug
             crashes_dir: Directory to save crash information
+            bloom: Optional SharedBloom (see shared_dedup.py) shared with
+                other fuzzer processes, so a crash one of them already
+                saved isn't saved again here
+            max_seen: Max number of crash hashes to remember, the oldest
+                are forgotten first
+            seen_ttl: Forget crash hashes not seen for this many seconds
+                (a forgotten crash just gets saved again if it comes back)
+            crash_file_ttl: If set, crash files older than this many seconds
+                are deleted by a background thread. Off by default, only
+                use it for really long runs where the disk fills up
         """
         self.timeout = timeout
         self.max_memory_mb = max_memory_mb
@@ -84,7 +132,87 @@ class CrashMonitor:
         self.crashes_dir.mkdir(parents=True, exist_ok=True)
         
 
-        self.seen_crashes = set()
+        # crash_hash -> when we last saw it, oldest first. Bounded by
+        # max_seen and seen_ttl so long runs don't grow forever
+        self.seen_crashes: OrderedDict[str, float] = OrderedDict()
+        self.max_seen = max_seen
+        self.seen_ttl = seen_ttl
+        self.bloom = bloom
+        
+        # Cheap keys (exception type + where it was raised) of exceptions
+        # we already built a full CrashInfo for, see _quick_key(). Kept
+        # apart from seen_crashes since those are hashed differently, but
+        # forgotten the same way (max_seen / seen_ttl)
+        self.seen_quick_keys: OrderedDict[str, float] = OrderedDict()
+        
+        # New crashes are written to disk by a background thread, so the
+        # caller doesn't wait on two file writes for every new crash.
+        # None in the queue tells the thread to stop (see close()). The
+        # thread is a daemon, so close() also runs at exit, otherwise
+        # whatever is still queued would be lost
+        self._q: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+        self._closed = False
+        atexit.register(self.close)
+        
+        self.crash_file_ttl = crash_file_ttl
+        self._stop = threading.Event()
+        self._cleaner = None
+        if crash_file_ttl is not None:
+            self._cleaner = threading.Thread(target=self._cleanup_loop, daemon=True)
+            self._cleaner.start()
+    
+    @staticmethod
+    def _quick_key(e: BaseException) -> str:
+        """
+        Cheap crash key: exception type + file:line of the innermost frame.
+        
+        traceback.format_exc() has to look up every frame and read the
+        source lines, so we only call it the first time we see an
+        exception raised from a given place. The key is hashed down to
+        12 hex chars (same as crash_hash) so long file paths don't pile
+        up in seen_quick_keys.
+        """
+        tb = e.__traceback__
+        if tb is None:
+            key = type(e).__name__
+        else:
+            while tb.tb_next is not None:
+                tb = tb.tb_next
+            key = f"{type(e).__name__}:{tb.tb_frame.f_code.co_filename}:{tb.tb_lineno}"
+        return hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+    
+    def _exception_crash(
+        self,
+        e: BaseException,
+        crash_type: str,
+        error_message: str,
+        input_data: bytes,
+    ) -> Tuple[CrashInfo, bool]:
+        """
+        Build the CrashInfo for an exception caught in execute_with_monitoring.
+        
+        Has to be called from inside the except block (for format_exc).
+        
+        Returns:
+            Tuple of (crash_info, already_seen). If the exception came from
+            a place we've seen before the CrashInfo has no stack trace
+        """
+        if self._remember(self.seen_quick_keys, self._quick_key(e)):
+            # Same place as an earlier crash, skip the stack trace
+            return CrashInfo(
+                crash_type=crash_type,
+                error_message=error_message,
+                input_data=input_data,
+            ), True
+        
+        return CrashInfo(
+            crash_type=crash_type,
+            error_message=error_message,
+            stack_trace=traceback.format_exc(),
+            input_data=input_data,
+        ), False
     
     def execute_with_monitoring(
         self,
@@ -106,6 +234,7 @@ class CrashMonitor:
         """
         crash_info = None
         result = None
+        already_seen = False
         
         start_time = time.time()
         
@@ -122,39 +251,94 @@ class CrashMonitor:
                 )
             
         except MemoryError as e:
-            crash_info = CrashInfo(
-                crash_type="memory",
-                error_message=str(e),
-                stack_trace=traceback.format_exc(),
-                input_data=input_data,
+            crash_info, already_seen = self._exception_crash(
+                e, "memory", str(e), input_data
             )
             
         except RecursionError as e:
-            crash_info = CrashInfo(
-                crash_type="recursion",
-                error_message=str(e),
-                stack_trace=traceback.format_exc(),
-                input_data=input_data,
+            crash_info, already_seen = self._exception_crash(
+                e, "recursion", str(e), input_data
             )
             
         except Exception as e:
-            crash_info = CrashInfo(
-                crash_type="exception",
-                error_message=f"{type(e).__name__}: {str(e)}",
-                stack_trace=traceback.format_exc(),
-                input_data=input_data,
+            crash_info, already_seen = self._exception_crash(
+                e, "exception", f"{type(e).__name__}: {str(e)}", input_data
             )
         
 
-        if crash_info and crash_info.crash_hash not in self.seen_crashes:
+        if crash_info and not already_seen and self._is_new_crash(crash_info.crash_hash):
             self._save_crash(crash_info)
-            self.seen_crashes.add(crash_info.crash_hash)
         
         return result, crash_info
     
+    def _remember(self, seen: OrderedDict, key: str) -> bool:
+        """
+        Mark a key as seen now, forgetting old keys past max_seen/seen_ttl.
+        
+        Args:
+            seen: seen_crashes or seen_quick_keys
+            key: Key to look up
+        
+        Returns:
+            True if the key was already there
+        """
+        now = time.monotonic()
+        
+        if key in seen:
+            # seen again, so it moves to the back of the line
+            seen[key] = now
+            seen.move_to_end(key)
+            return True
+        seen[key] = now
+        
+        # Entries are kept in last-seen order, so the stale ones are
+        # all at the front
+        while len(seen) > self.max_seen:
+            seen.popitem(last=False)
+        cutoff = now - self.seen_ttl
+        while seen and next(iter(seen.values())) < cutoff:
+            seen.popitem(last=False)
+        return False
+    
+    def _is_new_crash(self, crash_hash: str) -> bool:
+        """
+        Check if a crash hash is new and mark it as seen.
+        
+        The local dict is checked first so repeats of our own crashes
+        don't even touch the shared filter.
+        """
+        if self._remember(self.seen_crashes, crash_hash):
+            return False
+        
+        if self.bloom is not None:
+            # add() says False if another process already had it
+            return self.bloom.add(crash_hash)
+        return True
+    
     def _save_crash(self, crash: CrashInfo):
         """
-        Save crash information to disk.
+        Queue crash information to be saved to disk.
+        """
+        self._q.put(crash)
+    
+    def _writer_loop(self):
+        """
+        Background thread that writes queued crashes to disk.
+        """
+        while True:
+            crash = self._q.get()
+            if crash is None:
+                return
+            try:
+                self._write_crash(crash)
+            except Exception:
+                # Has to catch everything, if this thread dies every
+                # crash after this one just sits in the queue
+                log.exception("Failed to save crash %s", crash.crash_hash)
+    
+    def _write_crash(self, crash: CrashInfo):
+        """
+        Write crash information to disk.
         """
         base_name = f"crash_{crash.crash_hash}"
         
@@ -164,6 +348,8 @@ class CrashMonitor:
         
 
         info_file = self.crashes_dir / f"{base_name}.txt"
+        # backslashreplace since error messages can have lone surrogates
+        # in them (e.g. from undecodable input) that utf-8 can't encode
         info_file.write_text(
             f"Crash Type: {crash.crash_type}\n"
             f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(crash.timestamp))}\n"
@@ -171,12 +357,73 @@ class CrashMonitor:
             f"\n--- Stack Trace ---\n"
             f"{crash.stack_trace}\n"
             f"\n--- Input (hex) ---\n"
-            f"{crash.input_data.hex()}\n"
+            f"{crash.input_data.hex()}\n",
+            encoding="utf-8",
+            errors="backslashreplace",
         )
         
-        print(f"\n[CRASH] New crash found: {crash.crash_hash}")
-        print(f"        Type: {crash.crash_type}")
-        print(f"        Error: {crash.error_message[:80]}")
+        log.warning(
+            "New crash found: %s (type: %s) %s",
+            crash.crash_hash, crash.crash_type, crash.error_message[:80],
+        )
+    
+    def _cleanup_loop(self):
+        """
+        Background thread that deletes crash files older than crash_file_ttl.
+        """
+        interval = min(self.crash_file_ttl, 60.0)
+        while not self._stop.wait(interval):
+            self.cleanup_crash_files()
+    
+    def cleanup_crash_files(self) -> int:
+        """
+        Delete crash files older than crash_file_ttl.
+        
+        Returns:
+            Number of files deleted
+        """
+        if self.crash_file_ttl is None:
+            return 0
+        
+        cutoff = time.time() - self.crash_file_ttl
+        deleted = 0
+        for path in self.crashes_dir.glob("crash_*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    deleted += 1
+            except OSError:
+                # already gone or not ours to delete, skip it
+                continue
+        return deleted
+    
+    def close(self):
+        """
+        Wait for all queued crashes to be written, then stop the
+        background threads.
+        
+        Safe to call more than once. Also called at exit and by the
+        with statement, e.g.
+            with CrashMonitor() as monitor:
+                ...
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        
+        self._stop.set()
+        if self._writer.is_alive():
+            self._q.put(None)
+            self._writer.join()
+        if self._cleaner is not None:
+            self._cleaner.join()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 
 def check_memory_usage() -> float:
@@ -184,6 +431,23 @@ def check_memory_usage() -> float:
     Get current process memory usage in MB.
     
     Useful for detecting memory leaks or excessive allocation.
+    Reads /proc/self/statm on Linux (cheap enough to call every
+    iteration), anywhere else it falls back to psutil.
     """
+    global _statm_fd, _statm_pid, _statm_ok
+    
+    if _statm_ok:
+        try:
+            pid = os.getpid()
+            if _statm_pid != pid:
+                _statm_fd = os.open(_STATM, os.O_RDONLY)
+                _statm_pid = pid
+            # fields are: size resident shared ... (all in pages)
+            rss_pages = int(os.pread(_statm_fd, 128, 0).split()[1])
+            return rss_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, AttributeError, ValueError, IndexError):
+            # no /proc (or no pread/sysconf on this OS), don't try again
+            _statm_ok = False
+    
     process = psutil.Process()
     return process.memory_info().rss / (1024 * 1024)
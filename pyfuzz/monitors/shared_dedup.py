@@ -0,0 +1,119 @@
+"""
+Shared crash dedup for running several fuzzer processes
+
+Each CrashMonitor keeps its own seen_crashes set, so if you run a few
+fuzzer processes side by side (like AFL's -M/-S mode) they all save
+the same crashes. This is a Bloom filter that lives in shared memory,
+so every process can check and add crash hashes without sending
+anything to the others.
+
+A Bloom filter can say "seen" for something it never saw (false
+positive) but never the other way around. With 2^20 bits and 3 hashes
+that stays under 1% until there are ~85k different crashes (~1.5% at
+100k), which is way more than we'll ever find.
+
+Example usage:
+    # main process
+    bloom = SharedBloom()
+    # in each worker process
+    bloom = SharedBloom(name=bloom.name)
+    monitor = CrashMonitor(bloom=bloom)
+"""
+
+import hashlib
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+
+# Size of the filter in bits (128 KiB of shared memory)
+BLOOM_BITS = 1 << 20
+
+
+class SharedBloom:
+    """
+    Bloom filter of crash hashes in a multiprocessing.shared_memory block.
+    
+    There's no locking. Two processes setting bits in the same byte at
+    the same moment can lose one of the writes, worst case a crash gets
+    saved twice, which is fine for dedup.
+    """
+    
+    def __init__(self, name: Optional[str] = None, num_bits: int = BLOOM_BITS):
+        """
+        Create a new filter, or attach to an existing one.
+        
+        Args:
+            name: Name of an existing filter's shared memory (from .name).
+                If None a new zeroed block is created.
+            num_bits: Filter size in bits, only used when creating
+        """
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=num_bits // 8)
+            self.shm.buf[:] = bytes(len(self.shm.buf))
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        
+        # The OS can round the block up to a page, so every process sizes
+        # the filter from the block itself to get the same bit positions
+        self.num_bits = len(self.shm.buf) * 8
+        self.buf = self.shm.buf
+    
+    @property
+    def name(self) -> str:
+        """
+        Shared memory name to pass to SharedBloom(name=...) in other processes.
+        """
+        return self.shm.name
+    
+    def _positions(self, key: str) -> Tuple[int, int, int]:
+        """
+        Get the 3 bit positions for a key.
+        
+        One 12 byte blake2b digest cut into three 32-bit numbers, which
+        is as good as three differently salted hashes for this.
+        """
+        digest = hashlib.blake2b(key.encode(), digest_size=12, person=b"pyfuzz-bloom").digest()
+        n = self.num_bits
+        return (
+            int.from_bytes(digest[0:4], "little") % n,
+            int.from_bytes(digest[4:8], "little") % n,
+            int.from_bytes(digest[8:12], "little") % n,
+        )
+    
+    def __contains__(self, key: str) -> bool:
+        buf = self.buf
+        for pos in self._positions(key):
+            if not buf[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+    
+    def add(self, key: str) -> bool:
+        """
+        Add a key to the filter.
+        
+        Args:
+            key: Crash hash
+        
+        Returns:
+            True if the key wasn't in the filter before (a new crash)
+        """
+        buf = self.buf
+        new = False
+        for pos in self._positions(key):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not buf[byte] & mask:
+                buf[byte] |= mask
+                new = True
+        return new
+    
+    def close(self):
+        """
+        Detach from the shared memory. The process that created the
+        filter also frees it.
+        """
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
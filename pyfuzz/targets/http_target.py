@@ -10,10 +10,13 @@ Example usage:
 """
 
 import time
+import weakref
 import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import get_cookie_header
 from dataclasses import dataclass
 from typing import Dict, Optional
-from urllib.parse import urljoin
+from urllib.parse import urljoin, quote_from_bytes
 
 import sys
 sys.path.append('..')
@@ -61,15 +64,58 @@ class HttpTarget:
         self.config = config
         self.session = requests.Session()
         
+        # The default adapter only keeps 10 connections around, which
+        # isnt enough once we hammer the target. No retries either, a
+        # failed request is something we want to see, not hide
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=256, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # Put the headers on the session once so requests doesnt have
+        # to merge our dict into the session headers on every call
+        self.session.headers.update(self.config.headers)
+        
+        # The URL, method and headers never change, so the request is
+        # prepared once per session (see _prepare_for) and run() just
+        # copies it and swaps in the body (or the query string for GET).
+        # That skips most of the work requests does in session.post()
+        # for every call
+        self._is_get = self.config.method.upper() == "GET"
+        self._prepared = weakref.WeakKeyDictionary()
+        
+        # For GET the input goes in ?data=..., the URL up to there is
+        # the same every time. The raw bytes get percent-encoded
+        # straight onto it in run() (no decode, no params= dict)
+        sep = "&" if "?" in self.config.url else "?"
+        self._base_qs = f"{self.config.url}{sep}data="
+        
+        # Error words we look for in responses, each one gets a bit in
+        # the coverage hash. Kept as (word, bit) pairs so _coverage_hash
+        # doesn't redo the shifts. Six plain `in` checks on one lowered
+        # copy beat a single regex pass here (re has to try the whole
+        # alternation at every offset)
+        error_patterns = [
+            b"error",
+            b"exception",
+            b"traceback",
+            b"stack trace",
+            b"undefined",
+            b"null",
+        ]
+        self._error_bits = tuple(
+            (p, 1 << bit) for bit, p in enumerate(error_patterns)
+        )
+        
 
         self.response_sizes = []
     
-    def run(self, data: bytes) -> FuzzResult:
+    def run(self, data: bytes, session: Optional[requests.Session] = None) -> FuzzResult:
         """
         Send fuzzed data to the target.
         
         Args:
             data: Fuzzed input data to send
+            session: Session to send with (default: the target's own)
             
         Returns:
             FuzzResult with crash info if found
@@ -77,30 +123,31 @@ class HttpTarget:
         result = FuzzResult(input_data=data)
         start_time = time.time()
         
+        if session is None:
+            session = self.session
+        
         try:
-
-            if self.config.method.upper() == "POST":
-                response = self.session.post(
-                    self.config.url,
-                    data=data,
-                    headers=self.config.headers,
-                    timeout=self.config.timeout,
-                )
-            elif self.config.method.upper() == "GET":
-                response = self.session.get(
-                    self.config.url,
-                    params={"data": data.decode(errors="ignore")},
-                    headers=self.config.headers,
-                    timeout=self.config.timeout,
-                )
+            prepared, settings = self._prepare_for(session)
+            
+            # copy() because run() can be called from several threads
+            # at once, each needs its own body/headers
+            request = prepared.copy()
+            if self._is_get:
+                request.url = self._base_qs + quote_from_bytes(data, safe="")
             else:
-                response = self.session.request(
-                    self.config.method,
-                    self.config.url,
-                    data=data,
-                    headers=self.config.headers,
-                    timeout=self.config.timeout,
-                )
+                request.body = data
+                request.headers["Content-Length"] = str(len(data))
+            
+            # The target can set cookies on any response, so the Cookie
+            # header is rebuilt from the session's jar every time instead
+            # of keeping whatever was in it when we prepared
+            cookie = get_cookie_header(session.cookies, request)
+            if cookie:
+                request.headers["Cookie"] = cookie
+            else:
+                request.headers.pop("Cookie", None)
+            
+            response = session.send(request, timeout=self.config.timeout, **settings)
             
             result.execution_time = time.time() - start_time
             result.response_data = response.content
@@ -130,7 +177,39 @@ class HttpTarget:
         
         return result
     
-    def _generate_coverage_hash(self, response) -> str:
+    def _prepare_for(self, session: requests.Session):
+        """
+        Get the prepared request and send() settings for a session.
+        
+        Made the first time a session is used and then kept, so the
+        session's own headers/auth (e.g. one passed in with an auth
+        header) end up in the request next to config.headers, and the
+        proxy/CA settings from the environment are looked up once
+        instead of on every call.
+        
+        Args:
+            session: Session run() is sending with
+        
+        Returns:
+            (PreparedRequest, dict of proxies/verify/cert/stream for send())
+        """
+        cached = self._prepared.get(session)
+        if cached is None:
+            prepared = session.prepare_request(
+                requests.Request(
+                    method=self.config.method.upper(),
+                    url=self.config.url,
+                    headers=self.config.headers,
+                )
+            )
+            settings = session.merge_environment_settings(
+                prepared.url, {}, None, None, None
+            )
+            cached = (prepared, settings)
+            self._prepared[session] = cached
+        return cached
+    
+    def _generate_coverage_hash(self, response) -> int:
         """
         Generate a pseudo-coverage hash from the response.
         
@@ -139,34 +218,60 @@ class HttpTarget:
         
         A real coverage-guided fuzzer would instrument the target
         to track which code paths are executed.
+        
+        Everything is packed into one int (status code, size bucket,
+        one bit per error pattern) since the engine keeps these in a
+        set and ints are cheaper to hash than strings.
         """
-        size_bucket = len(response.content) // 100
+        return self._coverage_hash(response.status_code, response.content)
+    
+    def _coverage_hash(self, status: int, content: bytes) -> int:
+        """
+        Same as _generate_coverage_hash but from the raw status and body,
+        so targets that don't use requests (see http_target_async) can
+        share it.
+        """
+        size_bucket = len(content) // 100
         
 
-        error_patterns = [
-            b"error",
-            b"exception",
-            b"traceback",
-            b"stack trace",
-            b"undefined",
-            b"null",
-        ]
+        lowered = content.lower()
+        pattern_flags = 0
+        for pattern, bit in self._error_bits:
+            if pattern in lowered:
+                pattern_flags |= bit
         
-        pattern_flags = ""
-        for pattern in error_patterns:
-            if pattern in response.content.lower():
-                pattern_flags += "1"
-            else:
-                pattern_flags += "0"
+        return (status << 40) | (size_bucket << 8) | pattern_flags
+
+
+def create_session(pool_maxsize: int = 32) -> requests.Session:
+    """
+    Create a requests.Session with a connection pool for fuzzing.
+    
+    We only ever talk to one host, so one pool is enough, but it
+    should be big enough to keep connections alive between requests.
+    
+    Args:
+        pool_maxsize: Max connections to keep open to the target
         
-        hash_input = f"{response.status_code}_{size_bucket}_{pattern_flags}"
-        return hash_input
+    Returns:
+        Session to pass to FuzzingEngine(session=...)
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 def create_target_function(url: str, method: str = "POST") -> callable:
     """
     Factory function to create a target function for the fuzzing engine.
     
+    The returned function accepts an optional session= argument.
+    Pass a session from create_session() to FuzzingEngine and it will
+    reuse the same connections for every iteration instead of paying
+    for a new TCP handshake each time.
+    
     Args:
         url: Target URL
         method: HTTP method
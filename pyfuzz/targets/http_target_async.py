@@ -0,0 +1,177 @@
+"""
+Async HTTP Target for fuzzing with lots of requests in flight
+
+HttpTarget sends one request and then sits there waiting for the
+answer. Against a local server most of that time is just round trips,
+so this version sends a whole batch at once with aiohttp and collects
+the results as they come back.
+
+Needs aiohttp (pip install aiohttp), the normal HttpTarget doesn't.
+
+Example usage:
+    target = AsyncHttpTarget(HttpTargetConfig("http://localhost:5000/api/parse"))
+    results = target.run_many([b'{"a": 1}', b'{"b": 2}'])
+    target.close()
+"""
+
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+import aiohttp
+from urllib.parse import quote_from_bytes
+from yarl import URL
+
+import sys
+sys.path.append('..')
+from pyfuzz.core.engine import FuzzResult
+from pyfuzz.targets.http_target import HttpTarget, HttpTargetConfig
+
+
+class AsyncHttpTarget(HttpTarget):
+    """
+    Fuzz an HTTP endpoint, a batch of inputs at a time.
+    
+    Crash/coverage checks are the same as HttpTarget, and run() still
+    works for a single input. run_many() is what the engine calls
+    when it's given a batch_func.
+    """
+    
+    def __init__(self, config: HttpTargetConfig, concurrency: int = 256):
+        """
+        Initialize async HTTP target.
+        
+        Args:
+            config: Target configuration
+            concurrency: Max number of connections open at once
+        """
+        super().__init__(config)
+        self.concurrency = concurrency
+        
+        # Both of these get made on first use, the ClientSession has to
+        # be created while the event loop is running
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[aiohttp.ClientSession] = None
+    
+    async def _get_client(self) -> aiohttp.ClientSession:
+        """
+        Get the shared ClientSession, creating it the first time.
+        """
+        if self._client is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+            self._client = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.config.headers,
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+            )
+        return self._client
+    
+    async def _run_one(self, index: int, data: bytes) -> Tuple[int, FuzzResult]:
+        """
+        Send one fuzzed input.
+        
+        Returns the index too, since results come back out of order.
+        """
+        client = await self._get_client()
+        result = FuzzResult(input_data=data)
+        start_time = time.time()
+        
+        try:
+            method = self.config.method.upper()
+            if method == "GET":
+                # already encoded, so tell yarl not to quote it again
+                url = URL(self._base_qs + quote_from_bytes(data, safe=""), encoded=True)
+                request = client.get(url)
+            else:
+                request = client.request(method, self.config.url, data=data)
+            
+            async with request as response:
+                content = await response.read()
+            
+            result.execution_time = time.time() - start_time
+            result.response_data = content
+            
+            if response.status >= 500:
+                result.crashed = True
+                result.error_message = f"Server error: HTTP {response.status}"
+            
+            result.coverage_hash = self._coverage_hash(response.status, content)
+        
+        except asyncio.TimeoutError:
+            result.crashed = True
+            result.error_message = "Request timeout (possible hang/DoS)"
+            result.execution_time = time.time() - start_time
+        
+        except aiohttp.ClientConnectionError as e:
+            result.crashed = True
+            result.error_message = f"Connection error (server crash?): {str(e)[:100]}"
+            result.execution_time = time.time() - start_time
+        
+        except Exception as e:
+            result.crashed = True
+            result.error_message = f"Unexpected error: {str(e)[:100]}"
+            result.execution_time = time.time() - start_time
+        
+        return index, result
+    
+    async def run_batch(self, inputs: List[bytes]) -> List[FuzzResult]:
+        """
+        Send all inputs at once and wait for every result.
+        
+        Args:
+            inputs: Fuzzed inputs to send
+        
+        Returns:
+            List of FuzzResults, in the same order as inputs
+        """
+        results: List[Optional[FuzzResult]] = [None] * len(inputs)
+        tasks = [
+            asyncio.ensure_future(self._run_one(i, data))
+            for i, data in enumerate(inputs)
+        ]
+        for next_done in asyncio.as_completed(tasks):
+            index, result = await next_done
+            results[index] = result
+        return results
+    
+    def run_many(self, inputs: List[bytes]) -> List[FuzzResult]:
+        """
+        Blocking version of run_batch for the (not async) engine.
+        
+        Keeps one event loop around between calls so the connections
+        in the ClientSession stay open.
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.run_batch(inputs))
+    
+    def close(self):
+        """
+        Close the ClientSession and the event loop.
+        """
+        if self._loop is None:
+            return
+        if self._client is not None:
+            self._loop.run_until_complete(self._client.close())
+            self._client = None
+        self._loop.close()
+        self._loop = None
+
+
+def create_async_target(url: str, method: str = "POST", concurrency: int = 256) -> AsyncHttpTarget:
+    """
+    Factory function to create an async target for the fuzzing engine.
+    
+    Pass target.run_many as batch_func to FuzzingEngine, and call
+    target.close() when you're done.
+    
+    Args:
+        url: Target URL
+        method: HTTP method
+        concurrency: Max number of connections open at once
+    
+    Returns:
+        AsyncHttpTarget
+    """
+    config = HttpTargetConfig(url=url, method=method)
+    return AsyncHttpTarget(config, concurrency=concurrency)
@@ -65,7 +65,57 @@ engine = FuzzingEngine(
 
 # Just run a few iterations
 print("    Running 100 iterations...")
-engine.run(max_iterations=100, print_interval=50)
+engine.run(max_iterations=100, print_interval=0.5)
+
+# Test 4: Batch mutations
+print("\n[4] Testing mutate_batch...")
+batch = Mutator(seed=42).mutate_batch(original, 64)
+assert len(batch) == 64
+batch = mutator.mutate_batch(original, 64)
+assert len(batch) == 64
+print(f"    Got {len(batch)} mutations")
+print("    ✓ mutate_batch working!")
+
+# Test 5: Grammar
+print("\n[5] Testing JSON_GRAMMAR...")
+from pyfuzz.core.generators import JSON_GRAMMAR
+generated = JSON_GRAMMAR.generate()
+assert generated
+print(f"    Generated: {generated[:50]}")
+print("    ✓ Grammar working!")
+
+# Test 6: SharedBloom (attach by name like a worker process would)
+print("\n[6] Testing SharedBloom...")
+from pyfuzz.monitors.shared_dedup import SharedBloom
+bloom = SharedBloom()
+other = SharedBloom(name=bloom.name)
+assert bloom.add("abc123") is True
+assert "abc123" in other
+assert other.add("abc123") is False
+assert "not-added" not in other
+other.close()
+bloom.close()
+print("    ✓ SharedBloom working!")
+
+# Test 7: CrashMonitor writes queued crashes before close() returns
+print("\n[7] Testing CrashMonitor...")
+import tempfile
+from pathlib import Path
+from pyfuzz.monitors.crash_monitor import CrashMonitor
+
+def crashing_target(data: bytes):
+    raise ValueError("boom")
+
+with tempfile.TemporaryDirectory() as tmp:
+    monitor = CrashMonitor(crashes_dir=tmp)
+    _, crash = monitor.execute_with_monitoring(crashing_target, b"crash me")
+    assert crash is not None
+    monitor.close()
+    monitor.close()  # second close should do nothing
+    files = sorted(p.name for p in Path(tmp).iterdir())
+    assert files == [f"crash_{crash.crash_hash}.input", f"crash_{crash.crash_hash}.txt"]
+    print(f"    Saved: {files}")
+print("    ✓ CrashMonitor working!")
 
 print("\n" + "=" * 40)
 print("All tests passed!")